@@ -10,7 +10,7 @@ import queue
 import aioconsole
 import configparser
 import sys
-import struct
+import numpy as np
 
 import psutil
 import socket
@@ -185,25 +185,22 @@ def audio_stream(loop):
             input=True, 
             frames_per_buffer=CHUNK)
 
+        # CHANNELS never changes, so pick the mono conversion once
+        if CHANNELS == 2:
+            # View the stereo data as (CHUNK, 2) 16-bit frames and
+            # copy out the right channel in one strided memcpy
+            to_mono = lambda chunk: np.frombuffer(
+                chunk, dtype='<i2').reshape(-1, 2)[:, 1].tobytes()
+        else:
+            to_mono = bytes
+
         while not stop_event.is_set():
             try:
                 audio_chunk = stream.read(1024, exception_on_overflow=False)
 
-                mono_chunk = audio_chunk
-
-                if CHANNELS == 2:
-                    # Unpack the stereo data (2* CHUNK 16-bit shorts)
-                    data = struct.unpack('<' + str(2*CHUNK) + 'h', audio_chunk)
-
-                    # Extract right channel (every other sample, starting at 1)
-                    right_channel_data = data[1::2]
-                    
-                    # Repack the mono data back into a byte string
-                    mono_chunk = (
-                        struct.pack('<' + str(CHUNK) + 'h', *right_channel_data)
-                    )
                 # Send resulting mono or isolated-right chunk to transcription
-                loop.call_soon_threadsafe(audio_queue.put_nowait, mono_chunk)
+                # (queue.Queue is thread-safe; no need to go via the loop)
+                audio_queue.put_nowait(to_mono(audio_chunk))
             except IOError as e:
                 print(f"IO Error: {e}")
     except Exception as e:
@@ -227,7 +224,8 @@ def transcribe_loop(loop):
     )
 
     while not stop_event.is_set():
-        start_time = time.time()
+        # Monotonic, so a system clock change can't end the stream early
+        stream_deadline = time.monotonic() + 290
 
         def audio_requests_generator():
             try:
@@ -240,14 +238,28 @@ def transcribe_loop(loop):
                     "Restarting recognition.")
                 return
 
-            while not stop_event.is_set() and time.time() - start_time < 290:
+            while not stop_event.is_set() and time.monotonic() < stream_deadline:
                 try:
                     audio_chunk = audio_queue.get(timeout=1)
-                    yield speech.StreamingRecognizeRequest(
-                        audio_content=audio_chunk)
                 except queue.Empty:
                     continue
 
+                # Gather ~100ms (3200 bytes at 16kHz) per request, but
+                # never hold a partial batch for more than 150ms
+                batch = bytearray(audio_chunk)
+                deadline = time.monotonic() + 0.15
+                while len(batch) < 3200:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch += audio_queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+
+                yield speech.StreamingRecognizeRequest(
+                    audio_content=bytes(batch))
+
         try:
             responses = speech_client.streaming_recognize(
                 config=streaming_config,
@@ -259,12 +271,16 @@ def transcribe_loop(loop):
                     break
                 for result in response.results:
                     if result.is_final:
-                        original_text = (
-                            result.alternatives[0].transcript.strip())
+                        alternatives = result.alternatives
+                        if not alternatives:
+                            continue
+
+                        original_text = alternatives[0].transcript.strip()
+                        if not original_text:
+                            continue
                         
-                        # Print transcription safely on the main loop
-                        print_english = lambda text: print(f"English: {text}")
-                        loop.call_soon_threadsafe(print_english, original_text)
+                        # print() is thread-safe; no need to hop to the loop
+                        print(f"English: {original_text}")
                         
                         # Send result to the translation thread queue
                         translation_request_queue.put(original_text)
@@ -289,25 +305,40 @@ def synchronous_translate(text, lang_code):
     return translate_client.translate(
         text, target_language=lang_code)['translatedText']
 
-# FINAL STABLE LOGIC: Processes one language and broadcasts it
-def process_and_broadcast_single_lang(loop, original_text, lang_code, lang_name):
-    # 1. Perform blocking translation for a single language
-    translated_text = synchronous_translate(original_text, lang_code)
-    
-    # 2. Create JSON payload (language code is mandatory for client filtering)
+def build_text_message(lang_code, text):
+    # Language code is mandatory for client filtering.
     # The client expects a JSON string containing the language payload,
     # so we nest the JSON strings.
     payload = {
         "language_code": lang_code,
-        "text": translated_text
+        "text": text
     }
-    # Message sent is first level JSON (containing the second level JSON string)
-    message_to_send = json.dumps({"text": json.dumps(payload)})
+    # Message sent is first level JSON (containing the second level JSON
+    # string). The inner JSON is encoded compactly and then only escaped
+    # as a string, with no second dict to serialize.
+    inner = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+    return '{"text":' + json.dumps(inner, ensure_ascii=False) + '}'
+
+# The "New Talk" marker is never translated, so its frames are fixed
+NEW_TALK_MESSAGES = {
+    lang_code: build_text_message(lang_code, "New Talk")
+    for lang_code in TARGET_LANGUAGES
+}
+
+# FINAL STABLE LOGIC: Processes one language and broadcasts it
+def process_and_broadcast_single_lang(loop, original_text, lang_code, lang_name):
+    # 1. Perform blocking translation for a single language
+    translated_text = synchronous_translate(original_text, lang_code)
+    
+    # 2. Create JSON payload; "New Talk" frames never change, so use the
+    # ones built at startup
+    if original_text == "New Talk":
+        message_to_send = NEW_TALK_MESSAGES[lang_code]
+    else:
+        message_to_send = build_text_message(lang_code, translated_text)
     
-    # 3. Print only the translation (safely)
-    print_translation = (
-        lambda name, text: print(f"{name} [{lang_code}]: {text}"))
-    loop.call_soon_threadsafe(print_translation, lang_name, translated_text)
+    # 3. Print only the translation (print() is thread-safe)
+    print(f"{lang_name} [{lang_code}]: {translated_text}")
     
     # 4. Safely schedule and WAIT for the async broadcast to finish
     future = asyncio.run_coroutine_threadsafe(
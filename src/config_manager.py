@@ -136,3 +136,10 @@ class ConfigManager:
             for code in raw_codes.split(',') 
                 if code.strip() in self.LANGUAGE_MAP
         }
+
+        try:
+            self.max_concurrent_translations = int(
+                self.config['TRANSLATION']['max_concurrent_translations'])
+        except (KeyError, ValueError):
+            print("Max concurrent translations unspecified.  Defaulting to 8")
+            self.max_concurrent_translations = 8
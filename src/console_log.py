@@ -0,0 +1,39 @@
+# Status and debug lines from worker threads go through this buffer to a
+# single writer thread, so no caller ever waits on stdout or wakes the
+# event loop to print
+import sys
+import collections
+import threading
+
+_lines = collections.deque(maxlen=1024)
+_ready = threading.Event()
+_start_lock = threading.Lock()
+_writer = None
+
+
+def _write_lines():
+    """Writes queued log lines to stdout, one write per wakeup."""
+    while True:
+        _ready.wait()
+        _ready.clear()
+        lines = []
+        while _lines:
+            lines.append(_lines.popleft())
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+
+def log(message):
+    """Queues a line for the log writer thread (safe from any thread)."""
+    global _writer
+    if _writer is None:
+        with _start_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_lines, daemon=True)
+                _writer.start()
+    _lines.append(message)
+    _ready.set()
+
+
+__all__ = ["log"]
@@ -0,0 +1,15 @@
+# pybase64 is a SIMD drop-in for the web clients' audio encoding
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+# orjson is a faster drop-in for encoding the broadcast payloads
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    from json import dumps as json_dumps
+
+__all__ = ["base64", "json_dumps"]
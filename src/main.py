@@ -5,7 +5,7 @@ import concurrent.futures
 import argparse
 from config_manager import ConfigManager
 from transcription import TranscriptionEngine
-from translation import TranslationEngine
+from translation import TranslationEngine, NEW_TALK
 from text_to_speech import TextToSpeechEngine
 from networking import NetworkServer
 
@@ -21,7 +21,7 @@ async def wait_for_keypress(stop_event, translation_queue, cfg, transcriber):
                 stop_event.set()
                 break
             elif user_input == 'nt':
-                translation_queue.put("New Talk")
+                transcriber.queue_translation(NEW_TALK)
             elif user_input == 'p':
                 transcriber.toggle_pause()
             elif user_input in cfg.LANGUAGE_MAP:
@@ -45,7 +45,8 @@ async def main():
 
     # 1. Setup shared resources
     stop_event = asyncio.Event()
-    translation_queue = queue.Queue()
+    # Bounded so a Translate API outage can't grow it without limit
+    translation_queue = queue.Queue(maxsize=256)
     loop = asyncio.get_running_loop()
     executor = concurrent.futures.ThreadPoolExecutor()
 
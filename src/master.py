@@ -3,15 +3,19 @@ import queue
 import aioconsole
 import concurrent.futures
 import argparse
-import json
-import html
-import socket
+import struct
 from config_manager import ConfigManager
+from encoding import base64, json_dumps
+from console_log import log
 from transcription import TranscriptionEngine
-from translation import TranslationEngine
+from translation import TranslationEngine, NEW_TALK
 from networking import NetworkServer
 from text_to_speech import TextToSpeechEngine
 
+# Slave frame body: language length, text length, then language, text and
+# raw MP3 bytes (the audio runs to the end of the frame)
+SLAVE_HEADER = struct.Struct("!HI")
+
 class LanguagePortServer:
     """Manages individual port servers for each language"""
     def __init__(self, lang_code, port, config, tts_engine, loop):
@@ -20,15 +24,31 @@ class LanguagePortServer:
         self.config = config
         self.tts_engine = tts_engine
         self.loop = loop
-        self.clients = set()
+        # writer -> (send queue, sender task)
+        self.clients = {}
         self.server = None
-        
+
+    async def _sender(self, writer, send_queue):
+        """Drain one slave's queue onto its socket"""
+        try:
+            while True:
+                frame = await send_queue.get()
+                writer.writelines(frame)
+                await writer.drain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"[{self.lang_code}:{self.port}] Error sending to client: {e}")
+            writer.close()
+
     async def handle_client(self, reader, writer):
         """Handle a new slave connection"""
         addr = writer.get_extra_info('peername')
         print(f"[{self.lang_code}:{self.port}] Slave connected from {addr}")
-        self.clients.add((reader, writer))
-        
+        send_queue = asyncio.Queue(maxsize=32)
+        sender = asyncio.create_task(self._sender(writer, send_queue))
+        self.clients[writer] = (send_queue, sender)
+
         try:
             # Keep connection alive and wait for disconnect
             while True:
@@ -40,7 +60,8 @@ class LanguagePortServer:
             print(f"[{self.lang_code}:{self.port}] Connection error: {e}")
         finally:
             print(f"[{self.lang_code}:{self.port}] Slave disconnected from {addr}")
-            self.clients.discard((reader, writer))
+            self.clients.pop(writer, None)
+            sender.cancel()
             writer.close()
             await writer.wait_closed()
     
@@ -57,126 +78,97 @@ class LanguagePortServer:
             self.server.close()
             await self.server.wait_closed()
             
-    async def broadcast_audio(self, payload):
+    async def broadcast_audio(self, text, audio_bytes):
         """Broadcast audio to all connected slaves"""
-        if not payload:
-            return  # No payload, we shouldn't be here
         if not self.clients:
             return  # No clients, skip broadcast
-            
-        # Serialize to JSON and encode
-        json_data = json.dumps(payload).encode('utf-8')
+
+        # The socket is binary-safe, so the MP3 goes out as raw bytes
+        # behind a small fixed header rather than base64 inside JSON
+        lang_data = self.lang_code.encode('utf-8')
+        text_data = text.encode('utf-8')
+        header = SLAVE_HEADER.pack(len(lang_data), len(text_data))
+        audio_bytes = audio_bytes or b""
+        length = (len(header) + len(lang_data) + len(text_data)
+                  + len(audio_bytes))
         # Send length prefix (4 bytes) followed by data
-        length_prefix = len(json_data).to_bytes(4, byteorder='big')
-        full_message = length_prefix + json_data
-        
-        # Broadcast to all connected clients
-        disconnected = []
-        for reader, writer in self.clients:
+        length_prefix = length.to_bytes(4, byteorder='big')
+        # Kept as separate buffers so the audio is never copied just to
+        # prepend the header; writelines hands them all to the transport
+        frame = (length_prefix, header, lang_data, text_data, audio_bytes)
+
+        # Hand the same frame to every slave's sender task; a slave that
+        # has fallen a full queue behind is dropped rather than waited on
+        for writer, (send_queue, sender) in list(self.clients.items()):
             try:
-                writer.write(full_message)
-                await writer.drain()
-            except Exception as e:
-                print(f"[{self.lang_code}:{self.port}] Error sending to client: {e}")
-                disconnected.append((reader, writer))
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            self.clients.discard(client)
-
-class MasterTranslationEngine:
+                send_queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                print(f"[{self.lang_code}:{self.port}] Slave too slow, dropping")
+                self.clients.pop(writer, None)
+                sender.cancel()
+                writer.close()
+
+class MasterTranslationEngine(TranslationEngine):
     """Enhanced translation engine that broadcasts to port servers"""
     def __init__(self, config_manager, request_queue, network_server, 
                  port_servers, stop_event):
-        self.config = config_manager
-        self.translation_queue = request_queue
-        self.network_server = network_server
+        # Audio comes from each port server's TTS engine, not the base one
+        super().__init__(config_manager, request_queue, network_server,
+                         None, stop_event)
         self.port_servers = port_servers
-        self.stop_event = stop_event
-        from google.cloud import translate_v2 as translate
-        self.translate_client = translate.Client()
-
-    def synchronous_translate(self, text, orig_code, dest_code):
-        if orig_code == dest_code:
-            return text
-        trans_code = self.config.LANGUAGE_MAP[dest_code].translation_code
-        return self.translate_client.translate(text, 
-            target_language=(trans_code))['translatedText']
-
-    def process_and_broadcast_single_lang(self, loop, original_text, orig_code,
-                                          dest_code):
-        lang_name = self.config.LANGUAGE_MAP[dest_code].display_name
-        
-        # Get the port server for this language
+        # Only the text and audio change between a language's web
+        # messages, so the rest of the JSON is built once here
+        self.audio_frame_prefix = {
+            dest_code: ('{"type": "audio", "language_code": '
+                        f'{json_dumps(dest_code)}, "text": ')
+            for dest_code in self.config.target_languages
+        }
+
+    def has_clients(self, dest_code):
+        """Only translate and broadcast if someone is listening"""
         port_server = self.port_servers.get(dest_code)
         if not port_server:
-            return
-            
-        # Only translate and broadcast if there are connected slaves
+            return False
         if not port_server.clients and not self.network_server.clients:
             if self.config.debug_mode:
-                print(f"Skipping {lang_name} - no clients connected")
-            return
+                lang_name = self.config.target_languages[dest_code]
+                log(
+                    f"Skipping {lang_name} - no clients connected")
+            return False
+        return True
 
-        # Perform translation
-        translated_text = self.synchronous_translate(original_text, 
-                                                     orig_code, dest_code)
-
-        translated_text = html.unescape(translated_text)
+    def broadcast_translation(self, loop, translated_text, dest_code):
+        lang_name = self.config.target_languages[dest_code]
+        port_server = self.port_servers[dest_code]
 
         # Print translation
         if self.config.debug_mode:
-            print(f"{lang_name} [{dest_code}]: {translated_text}")
+            log(f"{lang_name} [{dest_code}]: {translated_text}")
 
-        audio_base64 = port_server.tts_engine.generate_audio(
+        audio_bytes = port_server.tts_engine.generate_audio(
             translated_text, dest_code)
 
-        payload = {
-            "type": "audio",
-            "language_code": dest_code,
-            "text": translated_text,
-            "audio": audio_base64
-        }
-
         # Broadcast to web clients (original functionality)
         if self.network_server.clients:
 
-            message_to_send = json.dumps(payload)
+            # Browsers get the audio as base64 inside JSON. The base64
+            # alphabet needs no JSON escaping, so it is quoted directly.
+            audio_json = (f'"{base64.b64encode(audio_bytes).decode("ascii")}"'
+                          if audio_bytes else 'null')
+            message_to_send = (self.audio_frame_prefix[dest_code]
+                               + json_dumps(translated_text)
+                               + ', "audio": ' + audio_json + '}')
 
-            future = asyncio.run_coroutine_threadsafe(
-                self.network_server.broadcast_message(message_to_send), loop)
-            try:
-                future.result(timeout=10)
-            except Exception as e:
-                print(f"Error broadcasting to web clients for {dest_code}: {e}")
+            self.schedule_broadcast(
+                loop, self.network_server.broadcast_message(message_to_send),
+                f"Error broadcasting to web clients for {dest_code}")
 
         # Broadcast audio to port server slaves
         if port_server.clients:
 
-            future = asyncio.run_coroutine_threadsafe(
-                port_server.broadcast_audio(payload), loop)
-            try:
-                future.result(timeout=15)
-            except Exception as e:
-                print(f"Error broadcasting audio to slaves for {dest_code}: {e}")
-
-    def translate_loop(self, loop):
-        while not self.stop_event.is_set():
-            orig_code = self.config.curr_lang
-            try:
-                original_text = self.translation_queue.get(timeout=1)
-                
-                for dest_code, lang_name in self.config.target_languages.items():
-                    self.process_and_broadcast_single_lang(
-                        loop, original_text, orig_code, dest_code)
-                
-                self.translation_queue.task_done()
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Error in translation loop: {e}")
-                import time
-                time.sleep(1)
+            self.schedule_broadcast(
+                loop, port_server.broadcast_audio(translated_text, audio_bytes),
+                f"Error broadcasting audio to slaves for {dest_code}")
 
 async def wait_for_keypress(stop_event, translation_queue, cfg, transcriber):
     langs = ", ".join(cfg.LANGUAGE_MAP.keys())
@@ -195,7 +187,7 @@ async def wait_for_keypress(stop_event, translation_queue, cfg, transcriber):
                 stop_event.set()
                 break
             elif user_input == 'nt':
-                translation_queue.put("New Talk")
+                transcriber.queue_translation(NEW_TALK)
             elif user_input == 'p':
                 transcriber.toggle_pause()
             elif user_input == 'm':
@@ -237,7 +229,8 @@ async def main():
 
     # Setup shared resources
     stop_event = asyncio.Event()
-    translation_queue = queue.Queue()
+    # Bounded so a Translate API outage can't grow it without limit
+    translation_queue = queue.Queue(maxsize=256)
     loop = asyncio.get_running_loop()
     executor = concurrent.futures.ThreadPoolExecutor()
 
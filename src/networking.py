@@ -1,5 +1,3 @@
-import asyncio
-import psutil
 import ipaddress
 import websockets
 from aiohttp import web
@@ -18,32 +16,30 @@ class NetworkServer:
         for iface, iface_type, ip in self.ip_addresses:
             print(f"{iface} ({iface_type}): {ip}")
 
-    def get_interface_type(self,interface_name):
-        name = interface_name.lower()
-        if "wi-fi" in name or "wlan" in name or "wifi" in name:
-            return "Wi-Fi"
-        elif "eth" in name or "en" in name:
-            return "Ethernet"
-        else:
-            return "Unknown"
-
-
     def get_ip_addresses(self):
-        addrs = psutil.net_if_addrs()
-        stats = psutil.net_if_stats()
-        result = []
+        # Connecting a UDP socket sends nothing, but makes the OS pick the
+        # outbound interface, which is the LAN address we want to advertise
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(('10.255.255.255', 1))
+                return [("default", "Unknown", s.getsockname()[0])]
+        except OSError:
+            pass
 
-        for interface, addr_list in addrs.items():
-            if not stats.get(interface) or not stats[interface].isup:
+        # No route available; fall back to whatever the hostname resolves to
+        result = []
+        try:
+            infos = socket.getaddrinfo(socket.gethostname(), None,
+                                       socket.AF_INET)
+        except socket.gaierror:
+            return result
+
+        for _, _, _, _, (ip, _) in infos:
+            ip_obj = ipaddress.ip_address(ip)
+            if ip_obj.is_loopback or ip_obj.is_link_local:
                 continue
-            for addr in addr_list:
-                if addr.family == socket.AF_INET:
-                    ip = addr.address
-                    ip_obj = ipaddress.ip_address(ip)
-                    if ip_obj.is_loopback or ip_obj.is_link_local:
-                        continue
-                    interface_type = self.get_interface_type(interface)
-                    result.append((interface, interface_type, ip))
+            if ("default", "Unknown", ip) not in result:
+                result.append(("default", "Unknown", ip))
         return result
 
     async def http_handler(self, request):
@@ -85,19 +81,15 @@ class NetworkServer:
                     self.transcriber.toggle_pause()
 
     async def broadcast_message(self, message):
-        if self.clients:
-            await asyncio.wait([asyncio.create_task(client.send(message)) 
-                for client in self.clients])
+        # broadcast() writes to each connection synchronously, with no
+        # per-client task. Only connections that aren't open are skipped;
+        # a slow client is still written to, and its data piles up in its
+        # write buffer with no backpressure.
+        websockets.broadcast(self.clients, message)
 
     async def broadcast_binary(self, data):
         """Broadcasts raw binary audio to all connected websocket clients."""
-        if self.clients:
-            # Use gather to send to everyone at once.
-            # return_exceptions=True shields against individual client failures.
-            await asyncio.gather(
-                *[client.send(data) for client in self.clients],
-                return_exceptions=True
-            )
+        websockets.broadcast(self.clients, data)
         
     async def register_mDNS(self):
 
@@ -5,11 +5,11 @@ Connects to master server and plays audio for a specific language
 """
 
 import asyncio
-import json
-import base64
 import argparse
 import sys
 import os
+import struct
+import subprocess
 from io import BytesIO
 
 try:
@@ -19,48 +19,64 @@ except ImportError:
     PYGAME_AVAILABLE = False
     print("Warning: pygame not available, trying alternative audio playback")
 
+# Frame body from the master: language length, text length, then language,
+# text and raw MP3 bytes (must match SLAVE_HEADER in master.py)
+SLAVE_HEADER = struct.Struct("!HI")
+
 class AudioPlayer:
     """Handles audio playback using pygame or mpg123"""
     def __init__(self, volume=0.8):
         self.volume = volume
         self.use_pygame = PYGAME_AVAILABLE
+        self.mpg123 = None
+        # Reused for every clip so playback doesn't allocate a new buffer
+        self._buf = BytesIO()
         
         if self.use_pygame:
             pygame.mixer.init()
-            pygame.mixer.music.set_volume(volume)
             print("Using pygame for audio playback")
         else:
             # Check if mpg123 is available
             if os.system("which mpg123 > /dev/null 2>&1") == 0:
+                self.start_mpg123()
                 print("Using mpg123 for audio playback")
             else:
                 print("Error: No audio playback available. Install pygame or mpg123")
                 sys.exit(1)
+
+    def start_mpg123(self):
+        """Start one long-lived mpg123 that plays MP3 data fed on stdin"""
+        self.mpg123 = subprocess.Popen(
+            ["mpg123", "-q", "-"], stdin=subprocess.PIPE, bufsize=0)
     
-    def play_audio(self, audio_base64):
-        """Play audio from base64 encoded MP3 data"""
+    def play_audio(self, audio_bytes):
+        """Play audio from raw MP3 data"""
         try:
-            # Decode base64 to bytes
-            audio_bytes = base64.b64decode(audio_base64)
-            
             if self.use_pygame:
-                # Use pygame for playback
-                audio_file = BytesIO(audio_bytes)
-                pygame.mixer.music.load(audio_file)
-                pygame.mixer.music.play()
-                
-                # Wait for playback to finish
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
+                # Refill the pooled buffer in place. Write before truncating:
+                # truncating at 0 would free the storage we want to reuse.
+                self._buf.seek(0)
+                self._buf.write(audio_bytes)
+                self._buf.truncate()
+                self._buf.seek(0)
+
+                # Decode the whole clip up front so its length is known
+                # before playback
+                sound = pygame.mixer.Sound(file=self._buf)
+                sound.set_volume(self.volume)
+                sound.play()
+
+                # Sleep once for the clip length instead of polling
+                pygame.time.wait(int(sound.get_length() * 1000))
             else:
-                # Use mpg123 for playback
-                import tempfile
-                with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as f:
-                    f.write(audio_bytes)
-                    temp_file = f.name
-                
-                os.system(f"mpg123 -q {temp_file}")
-                os.unlink(temp_file)
+                # Restart mpg123 if it has exited since the last clip
+                if self.mpg123.poll() is not None:
+                    print("mpg123 exited, restarting")
+                    self.start_mpg123()
+
+                # Stream the MP3 straight into the running player
+                self.mpg123.stdin.write(audio_bytes)
+                self.mpg123.stdin.flush()
                 
         except Exception as e:
             print(f"Error playing audio: {e}")
@@ -68,8 +84,13 @@ class AudioPlayer:
     def set_volume(self, volume):
         """Set playback volume (0.0 to 1.0)"""
         self.volume = max(0.0, min(1.0, volume))
-        if self.use_pygame:
-            pygame.mixer.music.set_volume(self.volume)
+
+    def close(self):
+        """Shut down the mpg123 player, if one is running"""
+        if self.mpg123:
+            self.mpg123.stdin.close()
+            self.mpg123.wait()
+            self.mpg123 = None
 
 class SlaveClient:
     """Connects to master server and plays audio"""
@@ -83,7 +104,7 @@ class SlaveClient:
         self.writer = None
         
     async def receive_message(self):
-        """Receive a length-prefixed JSON message"""
+        """Receive a length-prefixed audio frame"""
         try:
             # Read 4-byte length prefix
             length_bytes = await self.reader.readexactly(4)
@@ -91,9 +112,20 @@ class SlaveClient:
             
             # Read the actual message
             message_bytes = await self.reader.readexactly(message_length)
-            message_str = message_bytes.decode('utf-8')
-            
-            return json.loads(message_str)
+
+            # Split the frame into language, text and raw MP3 audio
+            lang_len, text_len = SLAVE_HEADER.unpack_from(message_bytes)
+            text_start = SLAVE_HEADER.size + lang_len
+            audio_start = text_start + text_len
+
+            return {
+                "type": "audio",
+                "language_code":
+                    message_bytes[SLAVE_HEADER.size:text_start].decode('utf-8'),
+                "text": message_bytes[text_start:audio_start].decode('utf-8'),
+                # A view, so the MP3 isn't copied out of the frame
+                "audio": memoryview(message_bytes)[audio_start:]
+            }
         except asyncio.IncompleteReadError:
             print("Connection closed by master")
             return None
@@ -216,6 +248,7 @@ async def main():
         print("\nShutting down...")
         client.stop()
     finally:
+        client.audio_player.close()
         print("Slave client stopped")
 
 if __name__ == "__main__":
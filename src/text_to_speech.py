@@ -1,8 +1,7 @@
 from google.cloud import texttospeech
-import base64
-import json
 import asyncio
 import concurrent.futures
+from encoding import base64, json_dumps
 
 class TextToSpeechEngine:
     def __init__(self, config_manager, network_server):
@@ -24,58 +23,58 @@ class TextToSpeechEngine:
             "sw2": {"language_code": "sw-KE", "name": "sw-KE-Chirp3-HD-Aoede"}
         }
 
+        # Build the request messages once; they only depend on the language
+        self.voice_params = {
+            lang_code: texttospeech.VoiceSelectionParams(
+                language_code=voice_conf["language_code"],
+                name=voice_conf["name"]
+            )
+            for lang_code, voice_conf in self.voice_config.items()
+        }
+
+        self.audio_config = texttospeech.AudioConfig(
+            audio_encoding=texttospeech.AudioEncoding.MP3,
+            speaking_rate=1.0,  # Normal speed
+            pitch=0.0  # Normal pitch
+        )
+
     def generate_audio(self, text, lang_code):
         """
         Generates audio from text using Google Cloud Text-to-Speech.
-        Returns base64-encoded audio data.
+        Returns raw MP3 bytes.
         """
         try:
-            # Get voice configuration for the language
-            voice_conf = self.voice_config.get(lang_code, self.voice_config["en"])
+            # Get voice for the language
+            voice = self.voice_params.get(lang_code, self.voice_params["en"])
             
             # Set the text input to be synthesized
             synthesis_input = texttospeech.SynthesisInput(text=text)
 
-            # Build the voice request
-            voice = texttospeech.VoiceSelectionParams(
-                language_code=voice_conf["language_code"],
-                name=voice_conf["name"]
-            )
-
-            # Select the type of audio file you want returned
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=1.0,  # Normal speed
-                pitch=0.0  # Normal pitch
-            )
-
             # Perform the text-to-speech request
             response = self.tts_client.synthesize_speech(
                 input=synthesis_input,
                 voice=voice,
-                audio_config=audio_config
+                audio_config=self.audio_config
             )
 
-            # Encode the audio content to base64 for transmission
-            audio_base64 = base64.b64encode(response.audio_content).decode('utf-8')
-            
-            return audio_base64
+            return response.audio_content
 
         except Exception as e:
             print(f"Error generating audio for {lang_code}: {e}")
             return None
 
-    async def broadcast_audio(self, audio_base64, lang_code):
+    async def broadcast_audio(self, audio_bytes, lang_code):
         """
         Broadcasts the audio to all connected clients.
         """
-        if audio_base64:
+        if audio_bytes:
+            # JSON can't carry binary, so encode for the web clients here
             payload = {
                 "type": "audio",
                 "language_code": lang_code,
-                "audio_data": audio_base64
+                "audio_data": base64.b64encode(audio_bytes).decode('utf-8')
             }
-            message = json.dumps(payload)
+            message = json_dumps(payload)
             await self.network_server.broadcast_message(message)
 
     def generate_and_broadcast(self, loop, text, lang_code):
@@ -84,12 +83,12 @@ class TextToSpeechEngine:
         This runs in a thread pool.
         """
         # Generate the audio (blocking operation)
-        audio_base64 = self.generate_audio(text, lang_code)
+        audio_bytes = self.generate_audio(text, lang_code)
         
-        if audio_base64:
+        if audio_bytes:
             # Schedule the async broadcast on the event loop
             future = asyncio.run_coroutine_threadsafe(
-                self.broadcast_audio(audio_base64, lang_code), 
+                self.broadcast_audio(audio_bytes, lang_code), 
                 loop
             )
             
@@ -1,4 +1,5 @@
 from google.cloud.speech_v2 import SpeechClient
+from google.cloud.speech_v2.services.speech.transports import SpeechGrpcTransport
 from google.cloud.speech_v2.types import cloud_speech
 from google.protobuf import duration_pb2
 import pyaudio
@@ -6,9 +7,141 @@ import numpy as np
 from scipy import signal
 import queue
 import time
-import struct
 import json
 import os
+import collections
+import threading
+from math import gcd
+from console_log import log
+# libsoxr's streaming resampler is used for capture when it's installed
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+# Unique sentinel queued to end the current stream. Checked by identity,
+# so no audio chunk can ever compare equal to it.
+_RESTART = object()
+
+class StreamResampler:
+    """
+    Polyphase FIR resampler that keeps filter history between chunks,
+    so consecutive chunks resample as one continuous signal.
+    """
+    def __init__(self, in_rate, out_rate, half_len=10):
+        g = gcd(in_rate, out_rate)
+        self.up = out_rate // g
+        self.down = in_rate // g
+        if self.up == self.down:
+            return  # Rates match; process() passes samples through
+
+        # Same anti-aliasing design as scipy's resample_poly. float32 is
+        # far more precision than 16-bit audio needs and keeps upfirdn
+        # working on half the bytes of its float64 default.
+        max_rate = max(self.up, self.down)
+        self.filter = (signal.firwin(2 * half_len * max_rate + 1,
+                                     1.0 / max_rate,
+                                     window=('kaiser', 5.0))
+                       * self.up).astype(np.float32)
+
+        # Input samples needed to fill the filter for one output
+        self.history_len = -(-len(self.filter) // self.up)
+        # Filter input: the first history_size samples are history from
+        # earlier chunks, the new chunk is written in right after them.
+        # Both this and the int16 output buffer are reused every chunk and
+        # only grow if a longer chunk than any before comes in.
+        self.work = np.zeros(0, dtype=np.float32)
+        self.history_size = 0
+        self.out = np.zeros(0, dtype=np.int16)
+        # Total input samples seen; history always starts on a multiple
+        # of self.down so the upfirdn output grid lines up across chunks
+        self.consumed = 0
+
+    def process(self, samples):
+        """
+        Resamples one chunk of int16 samples and returns int16. The result
+        is a view of an internal buffer and is only valid until the next
+        call, so callers must copy it (e.g. tobytes()) before then.
+        """
+        if self.up == self.down:
+            return samples
+
+        start = self.consumed - self.history_size
+        end = self.history_size + len(samples)
+        if len(self.work) < end:
+            work = np.empty(end + self.history_len, dtype=np.float32)
+            work[:self.history_size] = self.work[:self.history_size]
+            self.work = work
+        # samples may be a strided channel view; this one copy both
+        # de-interleaves it and widens it, so no mono copy is made first
+        self.work[self.history_size:end] = samples
+        out = signal.upfirdn(self.filter, self.work[:end], self.up, self.down)
+
+        # Keep only the outputs that fall within this chunk
+        lo = -(-(self.consumed - start) * self.up // self.down)
+        hi = -(-(self.consumed - start + len(samples)) * self.up // self.down)
+        resampled = out[lo:hi]
+
+        self.consumed += len(samples)
+        keep_from = max(start, (self.consumed - self.history_len)
+                        // self.down * self.down)
+        # Slide the history to the front (numpy handles the overlap)
+        self.history_size = end - (keep_from - start)
+        self.work[:self.history_size] = self.work[keep_from - start:end]
+
+        # Clip in place in the filter output, then convert into the
+        # reusable int16 buffer rather than a new array
+        np.clip(resampled, -32768, 32767, out=resampled)
+        if len(self.out) < len(resampled):
+            self.out = np.empty(len(resampled), dtype=np.int16)
+        result = self.out[:len(resampled)]
+        np.copyto(result, resampled, casting='unsafe')
+        return result
+
+class AudioRing:
+    """
+    Bounded single-producer/single-consumer chunk buffer between the audio
+    thread and the transcribe thread. deque append/popleft are atomic, so
+    passing a chunk takes no queue lock; when full the oldest chunk is
+    overwritten. Mirrors the parts of queue.Queue the engine uses.
+    """
+    def __init__(self, capacity=64):
+        self.chunks = collections.deque(maxlen=capacity)
+        # Only touched when the consumer has run dry and must sleep
+        self.ready = threading.Event()
+
+    def put_nowait(self, chunk):
+        self.chunks.append(chunk)
+        if not self.ready.is_set():
+            self.ready.set()
+
+    put = put_nowait
+
+    def get_nowait(self):
+        try:
+            return self.chunks.popleft()
+        except IndexError:
+            raise queue.Empty from None
+
+    def get(self, timeout=None):
+        while True:
+            try:
+                return self.chunks.popleft()
+            except IndexError:
+                pass
+            self.ready.clear()
+            # The producer may have appended between popleft and clear
+            if self.chunks:
+                continue
+            if not self.ready.wait(timeout):
+                raise queue.Empty
+
+    def empty(self):
+        return not self.chunks
+
+    def clear(self):
+        """Drops everything queued in one step."""
+        self.chunks.clear()
 
 class TranscriptionEngine:
     def __init__(self, config_manager, translation_queue, stop_event):
@@ -38,33 +171,152 @@ class TranscriptionEngine:
         self.recognizer = f"projects/{self.project_id}/locations/global/recognizers/_"
 
         self.audio = pyaudio.PyAudio()
-        self.audio_queue = queue.Queue()
+        # Hold at most ~2s of audio for Google. If the stream falls behind
+        # the oldest audio is dropped, since stale speech is of no use for
+        # live captions and must not pile up behind a closed gRPC window
+        self.audio_queue = AudioRing(
+            capacity=-(-self.config.hw_rate * 2 // 1024))
         # maxsize=20 ensures we never have more than ~400ms of lag
         self.broadcast_queue = queue.Queue(maxsize=20)
         self.monitor_queue = queue.Queue()
         self.monitor_enabled = False
-        self.speech_client = SpeechClient()
-
-        self._restart_signal = "RESTART_STREAM" 
+        # One client (and channel) serves every stream. Keepalive pings stop
+        # the idle connection being dropped between streams, so a restart
+        # doesn't have to pay for a new TCP/TLS handshake first.
+        channel = SpeechGrpcTransport.create_channel(options=[
+            ("grpc.keepalive_time_ms", 30000),
+            ("grpc.keepalive_timeout_ms", 10000),
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+        ])
+        self.speech_client = SpeechClient(
+            transport=SpeechGrpcTransport(channel=channel))
+
+        self.streaming_configs = self.build_streaming_configs()
+
+        self._restart_signal = _RESTART
         self.is_paused = True 
         self.STREAM_LIMIT = 290
+        # Without interim results Google only answers on finals and voice
+        # activity events, so allow a longer silence before calling a stall
+        self.STALL_LIMIT = 10 if self.config.debug_mode else 30
 
         print("--- Initialized in SLEEP mode. Waiting for clients. ---")
         
         # This tracks the last time input audio was received
-        self.last_audio_received_time = time.time()
-        # This tracks the last time we heard from Google re transcription
-        self.last_google_response_time = time.time()
+        self.last_audio_received_time = time.monotonic()
+        # Last time we heard from Google re transcription, stored as the
+        # time after which silence from Google counts as a stall
+        self.stall_deadline = time.monotonic() + self.STALL_LIMIT
+
+    def build_streaming_configs(self):
+        """
+        Builds the streaming config for every language once, so restarting
+        a stream doesn't rebuild the same protobuf messages.
+        """
+        keywords = self.config.church_keywords
+        adaptation = None
+        if keywords:
+            phrase_set = cloud_speech.PhraseSet(
+                phrases =[{"value": word,
+                           "boost": 15.0} for word in keywords]
+            )
+            adaptation = cloud_speech.SpeechAdaptation(
+                    phrase_sets = [
+                        cloud_speech.SpeechAdaptation.AdaptationPhraseSet(
+                            inline_phrase_set = phrase_set
+                        )]
+            )
+
+        decode_conf = cloud_speech.ExplicitDecodingConfig(
+            encoding=cloud_speech.ExplicitDecodingConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=16000,
+                audio_channel_count=1,
+            )
+
+        # Set to 1s (minimum allowed is 500ms)
+        voice_activity_timeout = cloud_speech.StreamingRecognitionFeatures.VoiceActivityTimeout(
+            speech_end_timeout=duration_pb2.Duration(
+                seconds=1, nanos=00000000)
+        )
+
+        streaming_features = cloud_speech.StreamingRecognitionFeatures(
+            enable_voice_activity_events=True,
+            # Interims are only ever looked at when debugging
+            interim_results=self.config.debug_mode,
+            voice_activity_timeout=voice_activity_timeout
+        )
+
+        streaming_configs = {}
+        for lang in self.config.LANGUAGE_MAP.values():
+            recognition_config = cloud_speech.RecognitionConfig(
+                explicit_decoding_config=decode_conf,
+                language_codes=[lang.speech_code],
+                model="long",
+                adaptation=adaptation
+            )
+
+            streaming_configs[lang.speech_code] = (
+                cloud_speech.StreamingRecognitionConfig(
+                    config=recognition_config,
+                    streaming_features=streaming_features
+                ))
+
+        return streaming_configs
 
     def restart_signal(self):
         """Public method to trigger a stream restart."""
         print("Restarting transcription stream for language change...")
-        while not self.audio_queue.empty():
+        self.audio_queue.clear()
+        self.audio_queue.put(self._restart_signal)
+
+    def get_audio_batch(self, max_bytes=3200, max_wait=0.1):
+        """
+        Blocks (up to 1s) for one chunk, then gathers whatever else arrives
+        within max_wait seconds, up to max_bytes (3200 = 100ms at 16kHz).
+        Returns the restart signal instead if one is pulled off the queue.
+        """
+        chunk = self.audio_queue.get(timeout=1)
+        if chunk is self._restart_signal:
+            return chunk
+
+        batch = bytearray(chunk)
+        deadline = time.monotonic() + max_wait
+        while len(batch) < max_bytes:
+            # Take anything already queued (e.g. a backlog after a restart)
+            # straight away; only check the clock when we'd have to wait
             try:
-                self.audio_queue.get_nowait()
+                chunk = self.audio_queue.get_nowait()
             except queue.Empty:
-                break
-        self.audio_queue.put(self._restart_signal)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    chunk = self.audio_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if chunk is self._restart_signal:
+                return chunk
+            batch += chunk
+
+        return bytes(batch)
+
+    def queue_translation(self, text):
+        """Queue text for translation, dropping the oldest if backed up."""
+        while True:
+            try:
+                self.translation_queue.put_nowait(text)
+                return
+            except queue.Full:
+                # Translation is stalled; stale captions are worth less
+                # than the newest one, and audio capture must not block
+                try:
+                    dropped = self.translation_queue.get_nowait()
+                    self.translation_queue.task_done()
+                    log("WARNING: Translation is lagging; dropped "
+                             f"oldest text: {dropped}")
+                except queue.Empty:
+                    pass
 
     def toggle_pause(self):
         self.is_paused = not self.is_paused
@@ -83,12 +335,23 @@ class TranscriptionEngine:
 
         FORMAT = pyaudio.paInt16
         CHANNELS = self.config.num_channels
-        INPUT_CHANNEL = self.config.input_channel
         HW_RATE = self.config.hw_rate
         GOOGLE_RATE = 16000
         DEVICE_INDEX = self.config.input_device_index
         CHUNK = 1024
 
+        process_chunk = self.build_chunk_processor(GOOGLE_RATE)
+
+        # Raw capture buffers, ~2s worth; the oldest is dropped if this
+        # thread ever falls that far behind
+        captured = AudioRing(capacity=-(-HW_RATE * 2 // CHUNK))
+
+        # Runs on PortAudio's own thread each time a buffer is captured.
+        # It only hands the buffer off, so capture never waits on
+        # resampling or on whatever else holds the GIL.
+        def capture_callback(audio_chunk, frame_count, time_info, status):
+            captured.put_nowait(audio_chunk)
+            return (None, pyaudio.paContinue)
 
         try:
             stream = self.audio.open(
@@ -97,37 +360,26 @@ class TranscriptionEngine:
                 rate=HW_RATE, 
                 input=True,
                 input_device_index=DEVICE_INDEX,
-                frames_per_buffer=CHUNK)
+                frames_per_buffer=CHUNK,
+                stream_callback=capture_callback)
+
+            stream.start_stream()
 
             while not self.stop_event.is_set():
                 try:
-                    audio_chunk = stream.read(1024, exception_on_overflow=False)
-
-                    samples = np.frombuffer(audio_chunk, dtype=np.int16)
-
-                    if CHANNELS == 2:
-                        # [0::2] is the Left channel, [1::2] is the Right
-                        channel_data = samples[INPUT_CHANNEL::2]
-                    else:
-                        channel_data = samples
-
-                    try:
-                        num_samples = int(len(channel_data) * GOOGLE_RATE / HW_RATE)
-                        resampled = signal.resample(channel_data, num_samples).astype(np.int16)
-                    except ImportError:
-                        # Fallback to linear interpolation
-                        num_samples = int(len(channel_data) * GOOGLE_RATE / HW_RATE)
-                        resampled = np.interp(
-                            np.linspace(0, len(channel_data), num_samples, endpoint=False),
-                            np.arange(len(channel_data)),
-                            channel_data
-                        ).astype(np.int16)
+                    audio_chunk = captured.get(timeout=0.1)
+                except queue.Empty:
+                    if not stream.is_active():
+                        break
+                    continue
 
+                try:
                     # Send resulting 16k mono bytes to transcription
-                    resampled_bytes = resampled.tobytes()
+                    resampled_bytes = process_chunk(audio_chunk)
 
-                    loop.call_soon_threadsafe(self.audio_queue.put_nowait, 
-                                              resampled_bytes)
+                    # Single producer, so this can write straight in
+                    # without a hop through the event loop
+                    self.audio_queue.put_nowait(resampled_bytes)
 
                     # Also send to the local broadcast queue
                     try:
@@ -144,10 +396,10 @@ class TranscriptionEngine:
                         except queue.Full:
                             pass  # Drop frame if montor can't keep up
 
-                except IOError as e:
-                    print(f"IO Error: {e}")
+                except Exception as e:
+                    print(f"Audio processing error: {e}")
         except Exception as e:
-            print(f"Buffer overflow: {e}")
+            print(f"Audio stream error: {e}")
         finally:
             if stream:
                 stream.stop_stream()
@@ -155,6 +407,32 @@ class TranscriptionEngine:
 
         pass
 
+    def build_chunk_processor(self, out_rate):
+        """
+        Returns a function that turns one raw capture chunk into mono
+        int16 bytes at out_rate. The channel layout is resolved here, once,
+        so the per-chunk path has no branches.
+        """
+        channels = self.config.num_channels
+        # Interleaved frames: [0::2] is the Left channel, [1::2] the Right.
+        # A mono stream is the same slice with a step of 1.
+        offset = self.config.input_channel if channels > 1 else 0
+        if soxr is not None and self.config.hw_rate != out_rate:
+            resampler = soxr.ResampleStream(
+                self.config.hw_rate, out_rate, 1, dtype='int16')
+
+            def resample(samples):
+                # soxr wants contiguous input, so copy the channel out
+                return resampler.resample_chunk(np.ascontiguousarray(samples))
+        else:
+            resample = StreamResampler(self.config.hw_rate, out_rate).process
+
+        def process_chunk(audio_chunk):
+            samples = np.frombuffer(audio_chunk, dtype=np.int16)
+            return resample(samples[offset::channels]).tobytes()
+
+        return process_chunk
+
     def monitor_loop(self, loop):
         """Plays the processed audio to the default output for monitoring."""
         stream = None
@@ -201,24 +479,14 @@ class TranscriptionEngine:
 
     # Function for transcribing the audio
     def transcribe_loop(self, loop):
-        keywords = self.config.church_keywords
-        adaptation = None
-        if keywords:
-            phrase_set = cloud_speech.PhraseSet(
-                phrases =[{"value": word,
-                           "boost": 15.0} for word in keywords]
-            )
-            adaptation = cloud_speech.SpeechAdaptation(
-                    phrase_sets = [
-                        cloud_speech.SpeechAdaptation.AdaptationPhraseSet(
-                            inline_phrase_set = phrase_set
-                        )]
-            )
-
-            if self.config.debug_mode:
-                loop.call_soon_threadsafe(
-                    print, "DEBUG: Applying English Church Keywords..."
-                )
+        """
+        Runs the blocking gRPC stream on its own worker thread. Nothing on
+        the per-chunk or per-result path touches the event loop: audio
+        arrives through the AudioRing, text leaves via queue_translation
+        and status lines via log().
+        """
+        if self.config.church_keywords and self.config.debug_mode:
+            log("DEBUG: Applying English Church Keywords...")
 
         while not self.stop_event.is_set():
             curr_lang_key = self.config.curr_lang
@@ -230,89 +498,80 @@ class TranscriptionEngine:
                       f"{curr_lang.display_name} "
                       f"({curr_lang.speech_code}) ---")
 
-            start_time = time.time()
+            stream_deadline = time.monotonic() + self.STREAM_LIMIT
             # Reset for the new stream
-            self.last_google_response_time = time.time() 
+            self.stall_deadline = time.monotonic() + self.STALL_LIMIT
 
             def audio_requests_generator():
-            
-                decode_conf = cloud_speech.ExplicitDecodingConfig(
-                    encoding=cloud_speech.ExplicitDecodingConfig.AudioEncoding.LINEAR16,
-                        sample_rate_hertz=16000,
-                        audio_channel_count=1,
-                    )
-
-                recognition_config = cloud_speech.RecognitionConfig(
-                    explicit_decoding_config=decode_conf,
-                    language_codes=[curr_lang_code],
-                    model="long",
-                    adaptation=adaptation
-                )
-    
+
                 print(f"Language code: {curr_lang_code}")
 
-                # Set to 1s (minimum allowed is 500ms)
-                voice_activity_timeout = cloud_speech.StreamingRecognitionFeatures.VoiceActivityTimeout(
-                    speech_end_timeout=duration_pb2.Duration(
-                        seconds=1, nanos=00000000)
-                )
-    
-                streaming_features = cloud_speech.StreamingRecognitionFeatures(
-                    enable_voice_activity_events=True,
-                    interim_results=True,
-                    voice_activity_timeout=voice_activity_timeout
-                )
-    
-                streaming_config = cloud_speech.StreamingRecognitionConfig(
-                    config=recognition_config,
-                    streaming_features=streaming_features
-                )
-    
                 # First request must be the config
                 yield cloud_speech.StreamingRecognizeRequest(
                     recognizer=self.recognizer,
-                    streaming_config=streaming_config
+                    streaming_config=self.streaming_configs[curr_lang_code]
                 )
 
-                while not self.stop_event.is_set():
-                    now = time.time()
-
-                    if now - start_time >= self.STREAM_LIMIT:
-                        loop.call_soon_threadsafe(print,
-                            "Reached Google 5-min limit. Refreshing stream.")
-                        return # Exit generator to trigger a fresh stream
+                # Bind what the loop touches on every batch to locals
+                stop_is_set = self.stop_event.is_set
+                get_audio_batch = self.get_audio_batch
+                restart_signal = self._restart_signal
+
+                # One request message, refilled for each batch. gRPC
+                # serializes each request as soon as it pulls it from this
+                # generator, before asking for the next, so reuse is safe.
+                request = cloud_speech.StreamingRecognizeRequest()
+
+                now = time.monotonic()
+                checks_due = 0
+                while not stop_is_set():
+                    # The limits below are whole seconds, so the clock only
+                    # needs reading every few batches or after a timeout
+                    if checks_due == 0:
+                        checks_due = 5
+                        now = time.monotonic()
+
+                        if now >= stream_deadline:
+                            log(
+                                "Reached Google 5-min limit. Refreshing stream.")
+                            return # Exit generator to trigger a fresh stream
  
-                    # If we have been sending audio for > 10s but Google hasn't
-                    # sent a single interim or final result back, it's stuck.
-                    if ((now - self.last_audio_received_time < 2) and 
-                        (now - self.last_google_response_time > 10)):
+                        # If we have been sending audio for a while but
+                        # Google hasn't sent a single result or event back,
+                        # it's stuck.
+                        if (now > self.stall_deadline and
+                                now - self.last_audio_received_time < 2):
 
-                        loop.call_soon_threadsafe(print, 
-                            "--- Stream Stall Detected. Restarting. ---")
-                        return # This kills the current gRPC session
+                            log(
+                                "--- Stream Stall Detected. Restarting. ---")
+                            return # This kills the current gRPC session
+                    checks_due -= 1
 
                     try:
-                        chunk = self.audio_queue.get(timeout=1)
+                        # ~100ms of audio per request keeps gRPC framing
+                        # overhead down without adding noticeable latency
+                        chunk = get_audio_batch()
 
                         self.last_audio_received_time = now
 
                         # POISON PILL CHECK
-                        if chunk == self._restart_signal:
+                        if chunk is restart_signal:
                             return
 
                         # If paused, don't yield the audio to Google
                         if self.is_paused:
-                            now = time.time()
-                            self.last_google_response_time = now
+                            self.stall_deadline = now + self.STALL_LIMIT
                             continue
 
-                        yield cloud_speech.StreamingRecognizeRequest(
-                            audio=chunk)
+                        request.audio = chunk
+                        yield request
  
                     except queue.Empty:
+                        checks_due = 0
+                        now = time.monotonic()
 
                         if now - self.last_audio_received_time > 5:
-                            loop.call_soon_threadsafe(print,
+                            log(
                                 "Waited for 5 seconds but no audio "
                                 "was received. Check input source. "
                                 "Restarting recognition.")
@@ -324,43 +583,50 @@ class TranscriptionEngine:
                     requests=audio_requests_generator()
                 )
 
+                stall_limit = self.STALL_LIMIT
+                debug = self.config.debug_mode
                 for response in responses:
  
                     # Note the return fom Google
-                    self.last_google_response_time = time.time() 
+                    self.stall_deadline = time.monotonic() + stall_limit
 
                     if self.stop_event.is_set():
                         break
 
-                    if not response.results or len(response.results) == 0:
+                    # Voice activity events carry no results; they only
+                    # count as a sign of life, which is noted above
+                    if response.speech_event_type:
+                        continue
+
+                    results = response.results
+                    if not results:
                         continue
 
-                    result = response.results[0]
+                    result = results[0]
 
                     if not result.is_final:
                         # Show what Google is "thinking" in real-time
                         # Useful for debugging
-                        #loop.call_soon_threadsafe(print, 
+                        #log(
                         #    f"Interim: {result.alternatives[0].transcript}")
                         pass
                     if result.is_final:
-                        if (not result.alternatives or
-                            len(result.alternatives) == 0):
-                            original_text = ""
-                        else:
-                            original_text = (
-                                result.alternatives[0].transcript.strip())
+                        # Fetch the repeated field once; skip empty finals
+                        # before decoding any transcript
+                        alternatives = result.alternatives
+                        if not alternatives:
+                            continue
 
+                        original_text = alternatives[0].transcript.strip()
                         if not original_text:
                             continue
 
-                        # Print transcription safely on the main loop
-                        if self.config.debug_mode:
-                            loop.call_soon_threadsafe(print,
-                                f"Orig.: {original_text}")
+                        # Print transcription off the recognizer thread
+                        if debug:
+                            log(f"Orig.: {original_text}")
  
                         # Send result to the translation thread queue
-                        self.translation_queue.put(original_text)
+                        self.queue_translation(original_text)
 
             except Exception as e:
                 err_str = str(e)
@@ -390,11 +656,12 @@ class TranscriptionEngine:
                     time.sleep(1)
         pass
 
-def __del__(self):
-    """Automatic cleanup when the object is destroyed."""
-    try:
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
-            print("PyAudio terminated.")
-    except Exception:
-        pass
+    def __del__(self):
+        """Automatic cleanup when the object is destroyed."""
+        try:
+            if hasattr(self, 'audio'):
+                self.audio.terminate()
+                print("PyAudio terminated.")
+        except Exception:
+            pass
+
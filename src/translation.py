@@ -1,11 +1,47 @@
-from google.cloud import translate_v2 as translate
-import json
+from google.cloud import translate_v3 as translate
 import asyncio
 import time
+import json
 import queue
+import collections
 import concurrent.futures
+import threading
+from encoding import json_dumps
+from console_log import log
+
+# translate_text takes at most 1024 strings per request, and Google
+# recommends keeping a request under 30K codepoints
+MAX_BATCH_TEXTS = 1024
+MAX_BATCH_CHARS = 25000
+
+# Queued by the operator's 'nt' command. It is English whatever the
+# speaker's language, so it is sent without a source language and the
+# API detects it.
+NEW_TALK = "New Talk"
+
+def split_batches(keys):
+    """
+    Splits (orig_code, text) keys into lists that each fit in one
+    translate_text request
+    """
+    batch = []
+    chars = 0
+    for key in keys:
+        size = len(key[1])
+        if batch and (len(batch) == MAX_BATCH_TEXTS or
+                      chars + size > MAX_BATCH_CHARS):
+            yield batch
+            batch = []
+            chars = 0
+        batch.append(key)
+        chars += size
+    if batch:
+        yield batch
 
 class TranslationEngine:
+    CACHE_SIZE = 4096
+    MAX_INFLIGHT = 32
+
     def __init__(self, config_manager, request_queue, network_server, 
                  tts_engine, stop_event):
         self.config = config_manager
@@ -13,59 +49,164 @@ class TranslationEngine:
         self.network_server = network_server
         self.tts_engine = tts_engine  # Text-to-speech engine
         self.stop_event = stop_event
-        self.translate_client = translate.Client()
+        # The gRPC client keeps one HTTP/2 connection open for every call
+        self.translate_client = translate.TranslationServiceClient()
+        # Same project as the transcriber: the one in the credentials
+        # file named by the config
+        with open(self.config.google_credentials, 'r') as f:
+            project_id = json.load(f)['project_id']
+        self.parent = f"projects/{project_id}/locations/global"
+        # Flat lookup of translation codes (target_languages already maps
+        # each target code to its display name)
+        self.translation_codes = {
+            code: lang.translation_code
+            for code, lang in self.config.LANGUAGE_MAP.items()
+        }
+        # The fixed fields of each (input, target) pair's request, built
+        # once. These templates are never modified: each call copies one
+        # into a fresh message, so concurrent workers share nothing mutable.
+        self.translate_templates = {
+            (orig_code, dest_code): translate.TranslateTextRequest(
+                parent=self.parent,
+                # Plain text in and out, so there are no HTML entities
+                mime_type="text/plain",
+                source_language_code=self.translation_codes[orig_code],
+                target_language_code=self.translation_codes[dest_code])
+            for orig_code in self.config.LANGUAGE_MAP
+            for dest_code in self.config.target_languages
+        }
+        # Auto-detected source (orig_code None), for NEW_TALK
+        self.translate_templates.update({
+            (None, dest_code): translate.TranslateTextRequest(
+                parent=self.parent,
+                mime_type="text/plain",
+                target_language_code=self.translation_codes[dest_code])
+            for dest_code in self.config.target_languages
+        })
+        # One worker per language, so every language's request is in
+        # flight at once and a batch waits only for the slowest reply.
+        # Capped so a long language list can't trip the API rate limit;
+        # past the cap, each finished request frees a worker for the next.
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max(1, min(len(self.config.target_languages),
+                                   self.config.max_concurrent_translations)))
+        # Recent translations per language, keyed on (orig_code, text), so
+        # repeated phrases ("Amen", "New Talk") skip the API. A worker from
+        # a failed batch may still be running when the next batch starts,
+        # so the caches are only touched under the lock.
+        self.translation_cache = {
+            dest_code: collections.OrderedDict()
+            for dest_code in self.config.target_languages
+        }
+        self.cache_lock = threading.Lock()
+        # Only the text changes between a language's messages, so the rest
+        # of its JSON (language code is mandatory for client filtering) is
+        # built once here
+        self.text_frame_prefix = {
+            dest_code: ('{"type": "text", "language_code": '
+                        f'{json_dumps(dest_code)}, "text": ')
+            for dest_code in self.config.target_languages
+        }
+        # Broadcasts run on the event loop in the order they are scheduled;
+        # this only bounds how many may be outstanding at once
+        self.inflight = threading.BoundedSemaphore(self.MAX_INFLIGHT)
 
-    def synchronous_translate(self, text, orig_code, dest_code):
+    def batch_translate(self, texts, orig_code, dest_code):
         """
-        Synchronous function for translation (must run in a thread)
+        Translates a list of texts into one language, sending them
+        together rather than one request per text (must run in a thread)
         """
         # If the origin and target language are the same, 
-        # just return the transcribed text
-        if orig_code == dest_code:
-            return text
+        # just return the transcribed text. Compare the translation codes:
+        # different entries (e.g. sw and sw2) can share one, and the API
+        # rejects a request whose source and target match.
+        if (self.translation_codes[orig_code] ==
+                self.translation_codes[dest_code]):
+            return texts
 
-        # Otherwise, perform the synchronous, blocking translation API call
-        trans_code = self.config.LANGUAGE_MAP[dest_code].translation_code
-        return self.translate_client.translate(text, 
-            target_language=(trans_code))['translatedText']
+        cache = self.translation_cache[dest_code]
+        keys = [(None if text == NEW_TALK else orig_code, text)
+                for text in texts]
+        # Only texts we haven't translated recently go to the API
+        unique = dict.fromkeys(keys)
+        results = {}
+        with self.cache_lock:
+            for key in unique:
+                if key in cache:
+                    cache.move_to_end(key)
+                    results[key] = cache[key]
+        missing = [key for key in unique if key not in results]
 
-    def process_and_broadcast_single_lang(self, loop, original_text, orig_code,
-                                          dest_code):
+        # Otherwise, perform the synchronous, blocking translation API
+        # call, one request per source language
+        for source in dict.fromkeys(key[0] for key in missing):
+            template = self.translate_templates[(source, dest_code)]
+            for batch in split_batches(
+                    [key for key in missing if key[0] == source]):
+                # Passing a message to the constructor copies it, so only
+                # the contents are set on the copy
+                request = translate.TranslateTextRequest(
+                    template, contents=[text for _, text in batch])
+                response = self.translate_client.translate_text(
+                    request=request)
+                for key, translation in zip(batch, response.translations):
+                    results[key] = translation.translated_text
+
+        with self.cache_lock:
+            for key in missing:
+                cache[key] = results[key]
+            while len(cache) > self.CACHE_SIZE:
+                cache.popitem(last=False)
+        return [results[key] for key in keys]
+
+    def has_clients(self, dest_code):
         """
-        Processes one language and broadcasts both text and audio
+        Whether anyone is listening for dest_code; languages without
+        listeners are neither translated nor broadcast
         """
-        lang_name = self.config.LANGUAGE_MAP[dest_code].display_name
+        return True
 
-        # Perform blocking translation for a single language
-        translated_text = self.synchronous_translate(original_text, 
-                                                     orig_code, dest_code)
+    def schedule_broadcast(self, loop, coro, error_msg):
+        """
+        Schedules a broadcast on the event loop without waiting for it to
+        finish. Only blocks once MAX_INFLIGHT broadcasts are outstanding.
+        """
+        if not self.inflight.acquire(timeout=10):
+            coro.close()
+            print(f"Warning: {error_msg}: broadcasts backed up, dropped.")
+            return
 
-        # Create JSON payload for text (language code is mandatory for client filtering)
-        payload = {
-            "type": "text",
-            "language_code": dest_code,
-            "text": translated_text
-        }
-        message_to_send = json.dumps(payload)
+        def on_done(future):
+            self.inflight.release()
+            if not future.cancelled() and future.exception():
+                print(f"{error_msg}: {future.exception()}")
+
+        try:
+            future = asyncio.run_coroutine_threadsafe(coro, loop)
+        except Exception:
+            self.inflight.release()
+            coro.close()
+            raise
+        future.add_done_callback(on_done)
+
+    def broadcast_translation(self, loop, translated_text, dest_code):
+        """
+        Broadcasts one translated text and its audio
+        """
+        lang_name = self.config.target_languages[dest_code]
+
+        # Create JSON payload for text from the language's prebuilt prefix
+        message_to_send = (self.text_frame_prefix[dest_code]
+                           + json_dumps(translated_text) + '}')
 
         # Print only the translation
         if self.config.debug_mode:
-            print_translation = (
-                lambda name, lang_code, text: 
-                print(f"{name} [{lang_code}]: {text}"))
-            loop.call_soon_threadsafe(print_translation, lang_name, dest_code, 
-                                      translated_text)
-
-        # Safely schedule and WAIT for the async text broadcast to finish
-        future = asyncio.run_coroutine_threadsafe(
-            self.network_server.broadcast_message(message_to_send), loop)
+            log(f"{lang_name} [{dest_code}]: {translated_text}")
 
-        try:
-            future.result(timeout=10)
-        except concurrent.futures.TimeoutError:
-            print(f"Warning: Network write for {dest_code} timed out.")
-        except Exception as e:
-            print(f"Error during network broadcast for {dest_code}: {e}")
+        # Schedule the async text broadcast and move straight on
+        self.schedule_broadcast(
+            loop, self.network_server.broadcast_message(message_to_send),
+            f"Error during network broadcast for {dest_code}")
 
         # Generate and broadcast audio
         if self.tts_engine:
@@ -78,16 +219,47 @@ class TranslationEngine:
         while not self.stop_event.is_set():
             orig_code = self.config.curr_lang
             try:
-                # Pull transcription result from the request queue
-                original_text = self.translation_queue.get(timeout=1)
-            
-                # Loop through all languages
-                for dest_code, lang_name in self.config.target_languages.items():
-                    # Handle broadcasts in this synchronous function call.
-                    self.process_and_broadcast_single_lang(
-                        loop, original_text, orig_code, dest_code)
-                
-                self.translation_queue.task_done()
+                # Pull transcription result from the request queue, along
+                # with anything else that has already queued up behind it
+                texts = [self.translation_queue.get(timeout=1)]
+                while True:
+                    try:
+                        texts.append(self.translation_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                # One translate call per language covers every text, and
+                # the languages are translated in parallel
+                futures = {
+                    self.executor.submit(
+                        self.batch_translate, texts, orig_code, dest_code):
+                        dest_code
+                    for dest_code in self.config.target_languages
+                    if dest_code != orig_code and self.has_clients(dest_code)
+                }
+                # The speaker's own language needs no translation, so it
+                # goes out straight away while the others are in flight
+                if (orig_code in self.config.target_languages and
+                        self.has_clients(orig_code)):
+                    for original_text in texts:
+                        self.broadcast_translation(loop, original_text,
+                                                   orig_code)
+                # Broadcast each language as soon as its reply is in,
+                # rather than holding fast languages behind a slow one
+                for future in concurrent.futures.as_completed(futures):
+                    dest_code = futures[future]
+                    # A failed language must not hold back the others
+                    try:
+                        translations = future.result()
+                    except Exception as e:
+                        print(f"Error translating to {dest_code}: {e}")
+                        continue
+                    for translated_text in translations:
+                        self.broadcast_translation(loop, translated_text,
+                                                   dest_code)
+
+                for _ in texts:
+                    self.translation_queue.task_done()
             except queue.Empty:
                 continue
             except Exception as e:
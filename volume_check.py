@@ -1,6 +1,8 @@
 import pyaudio
 import numpy as np
 import argparse
+import math
+import os
 import sys
 
 def main():
@@ -35,6 +37,14 @@ def main():
     print(f"Monitoring Device {args.device} (Channel {args.select}) at {args.rate}Hz...")
     print("Press Ctrl+C to stop.\n")
 
+    # One channel of one read (1024 frames), reused for every frame
+    buf = np.empty(1024, dtype=np.float32)
+    # Every bar length, already padded and encoded, so each frame only
+    # formats the number
+    bars = tuple(("█" * n).ljust(60).encode() for n in range(61))
+    # The meter writes straight to the fd, so push out the lines above
+    sys.stdout.flush()
+
     try:
         while True:
             # Read audio data
@@ -43,23 +53,24 @@ def main():
             # Convert to numpy array
             samples = np.frombuffer(data, dtype=np.int16)
             
-            # If multi-channel, extract only the requested channel
-            if args.channels > 1:
-                # Samples are interleaved: [C0, C1, C0, C1...]
-                samples = samples[args.select::args.channels]
+            # Extract only the requested channel (for mono the step is 1)
+            # Samples are interleaved: [C0, C1, C0, C1...]
+            channel = buf[:len(samples) // args.channels]
+            np.copyto(channel, samples[args.select::args.channels])
 
             # Calculate RMS (Root Mean Square) for volume
-            # We use float64 to avoid overflow during squaring
-            rms = np.sqrt(np.mean(samples.astype(np.float64)**2))
+            # float32 avoids overflow during squaring (int32 would overflow
+            # once the squares are summed) and dot() sums the squares
+            # without a squared temporary array
+            rms = math.sqrt(channel.dot(channel) / channel.size)
             
             # Normalize for a terminal bar (0 to 100ish)
             # 16-bit audio max is 32767. 
             level = int((rms / 32768) * 500) 
-            bar = "█" * min(level, 60)
             
-            # ANSI escape to overwrite the line
-            sys.stdout.write(f"\rVolume: [{bar:<60}] {rms:>7.1f} ")
-            sys.stdout.flush()
+            # ANSI escape to overwrite the line; one unbuffered write
+            os.write(1, b"\rVolume: [" + bars[min(level, 60)]
+                     + f"] {rms:>7.1f} ".encode())
 
     except KeyboardInterrupt:
         print("\nStopping...")